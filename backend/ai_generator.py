@@ -1,11 +1,37 @@
 import anthropic
-from typing import List, Optional
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 
 
 class AIGenerator:
     """Handles interactions with Anthropic's Claude API for generating responses"""
 
     MAX_TOOL_ROUNDS = 2
+    MAX_TOOL_WORKERS = 8
+    BATCH_POLL_INTERVAL = 30  # Seconds between Message Batches status checks
+    FALLBACK_RESPONSE = (
+        "I wasn't able to generate a response. Please try rephrasing your question."
+    )
+    # Yielded by agenerate_response_stream when already-streamed text is void
+    STREAM_RESET = object()
+
+    # API clients shared across instances, keyed by api_key, so every generator
+    # reuses one keep-alive connection pool instead of opening its own. They are
+    # built on the SDK's default httpx clients, which keep TCP keepalive, redirect
+    # handling, pool limits and the 600s read timeout long streams rely on. Only
+    # HTTP/2 is added, letting the initial call and tool follow-ups share one
+    # connection.
+    _clients: Dict[str, anthropic.Anthropic] = {}
+    _aclients: Dict[str, anthropic.AsyncAnthropic] = {}
+
+    # Tool calls are I/O bound, so independent calls in one round run
+    # concurrently on a pool shared by all instances (threads start lazily)
+    _tool_pool = ThreadPoolExecutor(max_workers=MAX_TOOL_WORKERS)
+
+    # Phrases in a fast-model answer that trigger escalation to the strong model
+    UNCERTAINTY_MARKERS = ("i'm not sure", "i am not sure", "i don't know")
 
     # Static system prompt to avoid rebuilding on each call
     SYSTEM_PROMPT = """ You are an AI assistant specialized in course materials and educational content with access to tools for course information.
@@ -35,44 +61,196 @@ All responses must be:
 Provide only the direct answer to what was asked.
 """
 
-    def __init__(self, api_key: str, model: str):
-        self.client = anthropic.Anthropic(api_key=api_key)
-        self.model = model
+    def __init__(
+        self,
+        api_key: str,
+        model: str,
+        fast_model: Optional[str] = None,
+        strong_model: Optional[str] = None,
+    ):
+        self.client = self._shared_client(api_key)
+        self.aclient = self._shared_aclient(api_key)
+
+        # Model cascade: simple queries are answered by fast_model, anything that
+        # needs tools or looks uncertain is escalated to strong_model. Without a
+        # distinct fast_model the cascade is disabled.
+        self.strong_model = strong_model or model
+        self.fast_model = fast_model or self.strong_model
+        self.model = self.strong_model
 
         # Pre-build base API parameters
         self.base_params = {"model": self.model, "temperature": 0, "max_tokens": 800}
 
-    def _execute_tools(self, response, tool_manager) -> list:
-        """Execute all tool calls in a response and return tool_result messages."""
+        # Static system prompt block marked as a prompt-cache breakpoint so the
+        # tools + system prefix is reused across queries. That prefix is only
+        # ~800 tokens today, below the 1024-token minimum cacheable length
+        # (2048 for Haiku), so this breakpoint is inert until the prompt or
+        # tool set grows; the tool-round checkpoints are what actually cache.
+        self.system_blocks = [
+            {
+                "type": "text",
+                "text": self.SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
+        # Frozen prefix for the conversation-history system block
+        self._history_prefix = "Previous conversation:\n"
+
+    @classmethod
+    def _shared_client(cls, api_key: str) -> anthropic.Anthropic:
+        """Return the process-wide sync client for api_key, creating it once."""
+        client = cls._clients.get(api_key)
+        if client is None:
+            client = cls._clients.setdefault(
+                api_key,
+                anthropic.Anthropic(
+                    api_key=api_key,
+                    max_retries=2,
+                    http_client=anthropic.DefaultHttpxClient(http2=True),
+                ),
+            )
+        return client
+
+    @classmethod
+    def _shared_aclient(cls, api_key: str) -> anthropic.AsyncAnthropic:
+        """Return the process-wide async client for api_key, creating it once."""
+        client = cls._aclients.get(api_key)
+        if client is None:
+            client = cls._aclients.setdefault(
+                api_key,
+                anthropic.AsyncAnthropic(
+                    api_key=api_key,
+                    max_retries=2,
+                    http_client=anthropic.DefaultAsyncHttpxClient(http2=True),
+                ),
+            )
+        return client
+
+    def _build_tool_results(self, blocks, outcomes) -> list:
+        """Pair tool_use blocks with their results (or exceptions) as tool_result messages."""
         tool_results = []
-        for block in response.content:
-            if block.type == "tool_use":
-                try:
-                    result = tool_manager.execute_tool(block.name, **block.input)
-                    tool_results.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": result,
-                        }
-                    )
-                except Exception as e:
-                    tool_results.append(
-                        {
-                            "type": "tool_result",
-                            "tool_use_id": block.id,
-                            "content": str(e),
-                            "is_error": True,
-                        }
-                    )
+        for block, outcome in zip(blocks, outcomes):
+            if isinstance(outcome, Exception):
+                tool_results.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": str(outcome),
+                        "is_error": True,
+                    }
+                )
+            else:
+                tool_results.append(
+                    {
+                        "type": "tool_result",
+                        "tool_use_id": block.id,
+                        "content": outcome,
+                    }
+                )
         return tool_results
 
+    def _execute_tools(self, blocks, tool_manager) -> list:
+        """Execute tool_use blocks concurrently and return tool_result messages
+        in the original block order."""
+        futures = [
+            self._tool_pool.submit(tool_manager.execute_tool, block.name, **block.input)
+            for block in blocks
+        ]
+        outcomes = []
+        for future in futures:
+            try:
+                outcomes.append(future.result())
+            except Exception as e:
+                outcomes.append(e)
+        return self._build_tool_results(blocks, outcomes)
+
+    async def _aexecute_tools(self, blocks, tool_manager) -> list:
+        """Async counterpart of _execute_tools, running tools in worker threads."""
+        outcomes = await asyncio.gather(
+            *[
+                asyncio.to_thread(tool_manager.execute_tool, block.name, **block.input)
+                for block in blocks
+            ],
+            return_exceptions=True,
+        )
+        return self._build_tool_results(blocks, outcomes)
+
+    def _split_content(self, response) -> Tuple[list, Optional[str]]:
+        """Walk response content once, returning its tool_use blocks and the
+        first text block's text."""
+        content = response.content
+        # Fast path: terminal responses are usually a single text block
+        if len(content) == 1 and content[0].type == "text":
+            return [], content[0].text
+
+        tool_blocks = []
+        text = None
+        for block in content:
+            if block.type == "tool_use":
+                tool_blocks.append(block)
+            elif text is None and block.type == "text":
+                text = block.text
+        return tool_blocks, text
+
     def _extract_text(self, response) -> Optional[str]:
         """Extract the first text block from a response."""
-        for block in response.content:
-            if block.type == "text":
-                return block.text
-        return None
+        return self._split_content(response)[1]
+
+    def _needs_escalation(self, response) -> bool:
+        """Whether a fast-model response should be redone with the strong model."""
+        if response.stop_reason in ("tool_use", "max_tokens"):
+            return True
+        text = (self._extract_text(response) or "").lower()
+        return not text or any(marker in text for marker in self.UNCERTAINTY_MARKERS)
+
+    def _build_system_content(self, conversation_history: Optional[str]) -> list:
+        """Build system content - history goes in its own uncached block so
+        changing history doesn't invalidate the cached system prompt."""
+        if not conversation_history:
+            return self.system_blocks
+        return self.system_blocks + [
+            {
+                "type": "text",
+                "text": self._history_prefix + conversation_history,
+            }
+        ]
+
+    def generate_batch(self, queries: List[str]) -> List[str]:
+        """
+        Answer many tool-free queries through the Message Batches API.
+
+        Batches are billed at a discount but may take up to 24h to finish, so
+        this is meant for offline work (evaluations, bulk summaries), not the
+        interactive path. Tool use is not supported: tools need a round-trip
+        per call, so every query is answered from the system prompt alone.
+
+        Args:
+            queries: Questions to answer
+
+        Returns:
+            Responses in the same order as queries
+        """
+        requests = []
+        for i, query in enumerate(queries):
+            params = self.base_params.copy()
+            params["system"] = self.system_blocks
+            params["messages"] = [{"role": "user", "content": query}]
+            requests.append({"custom_id": f"q{i}", "params": params})
+
+        batch = self.client.messages.batches.create(requests=requests)
+        while batch.processing_status != "ended":
+            time.sleep(self.BATCH_POLL_INTERVAL)
+            batch = self.client.messages.batches.retrieve(batch.id)
+
+        answers = {}
+        for entry in self.client.messages.batches.results(batch.id):
+            if entry.result.type == "succeeded":
+                answers[entry.custom_id] = self._extract_text(entry.result.message)
+
+        return [
+            answers.get(f"q{i}") or self.FALLBACK_RESPONSE for i in range(len(queries))
+        ]
 
     def generate_response(
         self,
@@ -83,7 +261,8 @@ Provide only the direct answer to what was asked.
     ) -> str:
         """
         Generate AI response with optional tool usage and conversation context.
-        Supports up to MAX_TOOL_ROUNDS sequential tool-call rounds.
+        Supports up to MAX_TOOL_ROUNDS sequential tool-call rounds. When a fast
+        model is configured it answers first and is escalated as needed.
 
         Args:
             query: The user's question or request
@@ -95,61 +274,226 @@ Provide only the direct answer to what was asked.
             Generated response as string
         """
 
-        # Build system content efficiently - avoid string ops when possible
-        system_content = (
-            f"{self.SYSTEM_PROMPT}\n\nPrevious conversation:\n{conversation_history}"
-            if conversation_history
-            else self.SYSTEM_PROMPT
-        )
+        system_content = self._build_system_content(conversation_history)
 
         # Build messages list
         messages = [{"role": "user", "content": query}]
 
-        # Prepare API call parameters
-        api_params = {
-            **self.base_params,
-            "messages": messages,
-            "system": system_content,
-        }
+        # Prepare API call parameters once; they are updated in place each round
+        api_params = self.base_params.copy()
+        api_params["messages"] = messages
+        api_params["system"] = system_content
 
         # Add tools if available
         if tools:
             api_params["tools"] = tools
             api_params["tool_choice"] = {"type": "auto"}
 
-        # Initial API call
-        response = self.client.messages.create(**api_params)
+        # Initial API call - try the fast model first when cascading
+        if self.fast_model != self.strong_model:
+            fast_params = api_params.copy()
+            fast_params["model"] = self.fast_model
+            response = self.client.messages.create(**fast_params)
+            if self._needs_escalation(response):
+                response = self.client.messages.create(**api_params)
+        else:
+            response = self.client.messages.create(**api_params)
 
         # Loop for up to MAX_TOOL_ROUNDS of tool execution
+        tool_blocks, text = self._split_content(response)
         for round in range(self.MAX_TOOL_ROUNDS):
-            if response.stop_reason != "tool_use" or not tool_manager:
+            if (
+                response.stop_reason != "tool_use"
+                or not tool_manager
+                or not tool_blocks
+            ):
                 break
 
-            # Append assistant's tool-use response
-            messages.append({"role": "assistant", "content": response.content})
+            # Execute tools, then append the assistant turn and its results
+            tool_results = self._execute_tools(tool_blocks, tool_manager)
+            # Checkpoint the transcript so the next round reads it from cache
+            tool_results[-1]["cache_control"] = {"type": "ephemeral"}
+            messages.extend(
+                [
+                    {"role": "assistant", "content": response.content},
+                    {"role": "user", "content": tool_results},
+                ]
+            )
 
-            # Execute tools and append results
-            tool_results = self._execute_tools(response, tool_manager)
-            if tool_results:
-                messages.append({"role": "user", "content": tool_results})
+            # api_params already references messages; strip tools on final round
+            if round == self.MAX_TOOL_ROUNDS - 1:
+                api_params.pop("tools", None)
+                api_params.pop("tool_choice", None)
 
-            # Build follow-up call params
-            follow_up_params = {
-                **self.base_params,
-                "messages": messages,
-                "system": system_content,
-            }
+            response = self.client.messages.create(**api_params)
+            tool_blocks, text = self._split_content(response)
+
+        return text or self.FALLBACK_RESPONSE
+
+    async def agenerate_response(
+        self,
+        query: str,
+        conversation_history: Optional[str] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+    ) -> str:
+        """
+        Async variant of generate_response using the AsyncAnthropic client, so
+        a single event loop can serve many in-flight queries.
 
-            # Keep tools attached on intermediate rounds, strip on final round
-            if round < self.MAX_TOOL_ROUNDS - 1 and tools:
-                follow_up_params["tools"] = tools
-                follow_up_params["tool_choice"] = {"type": "auto"}
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+
+        Returns:
+            Generated response as string
+        """
 
-            response = self.client.messages.create(**follow_up_params)
+        system_content = self._build_system_content(conversation_history)
 
-        # Extract text from response
-        text = self._extract_text(response)
-        return (
-            text
-            or "I wasn't able to generate a response. Please try rephrasing your question."
-        )
+        # Build messages list
+        messages = [{"role": "user", "content": query}]
+
+        # Prepare API call parameters once; they are updated in place each round
+        api_params = self.base_params.copy()
+        api_params["messages"] = messages
+        api_params["system"] = system_content
+
+        # Add tools if available
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = {"type": "auto"}
+
+        # Initial API call - try the fast model first when cascading
+        if self.fast_model != self.strong_model:
+            fast_params = api_params.copy()
+            fast_params["model"] = self.fast_model
+            response = await self.aclient.messages.create(**fast_params)
+            if self._needs_escalation(response):
+                response = await self.aclient.messages.create(**api_params)
+        else:
+            response = await self.aclient.messages.create(**api_params)
+
+        # Loop for up to MAX_TOOL_ROUNDS of tool execution
+        tool_blocks, text = self._split_content(response)
+        for round in range(self.MAX_TOOL_ROUNDS):
+            if (
+                response.stop_reason != "tool_use"
+                or not tool_manager
+                or not tool_blocks
+            ):
+                break
+
+            # Execute tools, then append the assistant turn and its results
+            tool_results = await self._aexecute_tools(tool_blocks, tool_manager)
+            # Checkpoint the transcript so the next round reads it from cache
+            tool_results[-1]["cache_control"] = {"type": "ephemeral"}
+            messages.extend(
+                [
+                    {"role": "assistant", "content": response.content},
+                    {"role": "user", "content": tool_results},
+                ]
+            )
+
+            # api_params already references messages; strip tools on final round
+            if round == self.MAX_TOOL_ROUNDS - 1:
+                api_params.pop("tools", None)
+                api_params.pop("tool_choice", None)
+
+            response = await self.aclient.messages.create(**api_params)
+            tool_blocks, text = self._split_content(response)
+
+        return text or self.FALLBACK_RESPONSE
+
+    async def agenerate_response_stream(
+        self,
+        query: str,
+        conversation_history: Optional[str] = None,
+        tools: Optional[List] = None,
+        tool_manager=None,
+    ) -> AsyncIterator:
+        """
+        Streaming variant of agenerate_response that yields text deltas as they
+        arrive. A turn's stop reason is only known once it has streamed, so
+        when a turn turns out to call tools, or a fast-model turn is escalated,
+        STREAM_RESET is yielded and the caller should discard the text so far.
+
+        Args:
+            query: The user's question or request
+            conversation_history: Previous messages for context
+            tools: Available tools the AI can use
+            tool_manager: Manager to execute tools
+
+        Yields:
+            Chunks of generated text, or STREAM_RESET
+        """
+
+        system_content = self._build_system_content(conversation_history)
+
+        # Build messages list
+        messages = [{"role": "user", "content": query}]
+
+        # Prepare API call parameters once; they are updated in place each round
+        api_params = self.base_params.copy()
+        api_params["messages"] = messages
+        api_params["system"] = system_content
+
+        # Add tools if available
+        if tools:
+            api_params["tools"] = tools
+            api_params["tool_choice"] = {"type": "auto"}
+
+        emitted = False
+        for round in range(self.MAX_TOOL_ROUNDS + 1):
+            # Try the fast model first on the initial turn when cascading
+            attempts = [api_params]
+            if round == 0 and self.fast_model != self.strong_model:
+                attempts.insert(0, {**api_params, "model": self.fast_model})
+
+            for params in attempts:
+                emitted = False
+                async with self.aclient.messages.stream(**params) as stream:
+                    async for text in stream.text_stream:
+                        emitted = True
+                        yield text
+                    response = await stream.get_final_message()
+
+                if params is api_params or not self._needs_escalation(response):
+                    break
+                # Escalating: the fast model's text is superseded
+                if emitted:
+                    yield self.STREAM_RESET
+
+            tool_blocks, _ = self._split_content(response)
+            if (
+                round == self.MAX_TOOL_ROUNDS
+                or response.stop_reason != "tool_use"
+                or not tool_manager
+                or not tool_blocks
+            ):
+                break
+
+            # Text from a tool-use turn is preamble, not part of the answer
+            if emitted:
+                yield self.STREAM_RESET
+
+            # Execute tools, then append the assistant turn and its results
+            tool_results = await self._aexecute_tools(tool_blocks, tool_manager)
+            # Checkpoint the transcript so the next round reads it from cache
+            tool_results[-1]["cache_control"] = {"type": "ephemeral"}
+            messages.extend(
+                [
+                    {"role": "assistant", "content": response.content},
+                    {"role": "user", "content": tool_results},
+                ]
+            )
+
+            # api_params already references messages; strip tools on final round
+            if round == self.MAX_TOOL_ROUNDS - 1:
+                api_params.pop("tools", None)
+                api_params.pop("tool_choice", None)
+
+        if not emitted:
+            yield self.FALLBACK_RESPONSE
@@ -6,15 +6,21 @@ from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel
-from typing import List, Optional
+from typing import Dict, List, Optional
+import orjson
 import os
 
 from config import config
 from rag_system import RAGSystem
 
 # Initialize FastAPI app
-app = FastAPI(title="Course Materials RAG System", root_path="")
+app = FastAPI(
+    title="Course Materials RAG System",
+    root_path="",
+    default_response_class=ORJSONResponse,
+)
 
 # Add trusted host middleware for proxy
 app.add_middleware(TrustedHostMiddleware, allowed_hosts=["*"])
@@ -63,10 +69,19 @@ class CourseStats(BaseModel):
     course_titles: List[str]
 
 
+def serialize_sources(sources: List[Dict]) -> List[Dict]:
+    """Shape source dicts like SourceItem, with link defaulting to None"""
+    return [{"name": source["name"], "link": source.get("link")} for source in sources]
+
+
 # API Endpoints
+#
+# Responses are built as plain dicts and serialized with orjson; the models
+# above are attached via `responses` for OpenAPI docs only, so FastAPI skips
+# re-validating and jsonable_encoder-ing every payload.
 
 
-@app.post("/api/query", response_model=QueryResponse)
+@app.post("/api/query", responses={200: {"model": QueryResponse}})
 async def query_documents(request: QueryRequest):
     """Process a query and return response with sources"""
     try:
@@ -76,21 +91,56 @@ async def query_documents(request: QueryRequest):
             session_id = rag_system.session_manager.create_session()
 
         # Process query using RAG system
-        answer, sources = rag_system.query(request.query, session_id)
-
-        return QueryResponse(answer=answer, sources=sources, session_id=session_id)
+        answer, sources = await rag_system.aquery(request.query, session_id)
+
+        return ORJSONResponse(
+            {
+                "answer": answer,
+                "sources": serialize_sources(sources),
+                "session_id": session_id,
+            }
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/api/courses", response_model=CourseStats)
+@app.post("/api/query/stream")
+async def query_documents_stream(request: QueryRequest):
+    """Process a query and stream the answer as server-sent events"""
+    # Create session if not provided
+    session_id = request.session_id
+    if not session_id:
+        session_id = rag_system.session_manager.create_session()
+
+    async def event_stream():
+        # Headers are already sent once streaming starts, so failures are
+        # reported as an error event rather than an HTTP status
+        try:
+            async for event in rag_system.aquery_stream(request.query, session_id):
+                if event["type"] == "done":
+                    event = {
+                        "type": "done",
+                        "sources": serialize_sources(event["sources"]),
+                        "session_id": session_id,
+                    }
+                yield b"data: " + orjson.dumps(event) + b"\n\n"
+        except Exception as e:
+            error = {"type": "error", "detail": str(e)}
+            yield b"data: " + orjson.dumps(error) + b"\n\n"
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+
+@app.get("/api/courses", responses={200: {"model": CourseStats}})
 async def get_course_stats():
     """Get course analytics and statistics"""
     try:
         analytics = rag_system.get_course_analytics()
-        return CourseStats(
-            total_courses=analytics["total_courses"],
-            course_titles=analytics["course_titles"],
+        return ORJSONResponse(
+            {
+                "total_courses": analytics["total_courses"],
+                "course_titles": analytics["course_titles"],
+            }
         )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
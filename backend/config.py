@@ -13,6 +13,7 @@ class Config:
     # Anthropic API settings
     ANTHROPIC_API_KEY: str = os.getenv("ANTHROPIC_API_KEY", "")
     ANTHROPIC_MODEL: str = "claude-sonnet-4-20250514"
+    ANTHROPIC_FAST_MODEL: str = "claude-3-5-haiku-20241022"  # Cascade first tier
 
     # Embedding model settings
     EMBEDDING_MODEL: str = "all-MiniLM-L6-v2"
@@ -23,6 +24,10 @@ class Config:
     MAX_RESULTS: int = 5  # Maximum search results to return
     MAX_HISTORY: int = 2  # Number of conversation messages to remember
 
+    # Semantic response cache settings
+    SEMANTIC_CACHE_THRESHOLD: float = 0.9  # Cosine similarity needed for a hit
+    SEMANTIC_CACHE_SIZE: int = 1024  # Maximum cached responses (FIFO eviction)
+
     # Database paths
     CHROMA_PATH: str = "./chroma_db"  # ChromaDB storage location
 
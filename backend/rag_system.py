@@ -1,9 +1,11 @@
-from typing import List, Tuple, Optional, Dict
+from typing import AsyncIterator, List, Tuple, Optional, Dict
+import asyncio
 import os
 from document_processor import DocumentProcessor
 from vector_store import VectorStore
 from ai_generator import AIGenerator
 from session_manager import SessionManager
+from semantic_cache import SemanticCache
 from search_tools import ToolManager, CourseSearchTool, CourseOutlineTool
 from models import Course, Lesson, CourseChunk
 
@@ -22,10 +24,20 @@ class RAGSystem:
             config.CHROMA_PATH, config.EMBEDDING_MODEL, config.MAX_RESULTS
         )
         self.ai_generator = AIGenerator(
-            config.ANTHROPIC_API_KEY, config.ANTHROPIC_MODEL
+            config.ANTHROPIC_API_KEY,
+            config.ANTHROPIC_MODEL,
+            fast_model=config.ANTHROPIC_FAST_MODEL,
         )
         self.session_manager = SessionManager(config.MAX_HISTORY)
 
+        # Serve near-duplicate questions without an LLM round-trip, reusing the
+        # vector store's embedding model
+        self.response_cache = SemanticCache(
+            self.vector_store.embedding_function,
+            threshold=config.SEMANTIC_CACHE_THRESHOLD,
+            max_entries=config.SEMANTIC_CACHE_SIZE,
+        )
+
         # Initialize search tools
         self.tool_manager = ToolManager()
         self.search_tool = CourseSearchTool(self.vector_store)
@@ -55,6 +67,10 @@ class RAGSystem:
             # Add course content chunks to vector store
             self.vector_store.add_course_content(course_chunks)
 
+            # Cached answers may be stale now that the catalog changed
+            self.response_cache.clear()
+            self.tool_manager.clear_cache()
+
             return course, len(course_chunks)
         except Exception as e:
             print(f"Error processing course document {file_path}: {e}")
@@ -80,6 +96,8 @@ class RAGSystem:
         if clear_existing:
             print("Clearing existing data for fresh rebuild...")
             self.vector_store.clear_all_data()
+            self.response_cache.clear()
+            self.tool_manager.clear_cache()
 
         if not os.path.exists(folder_path):
             print(f"Folder {folder_path} does not exist")
@@ -116,6 +134,11 @@ class RAGSystem:
                 except Exception as e:
                     print(f"Error processing {file_name}: {e}")
 
+        # Cached answers may be stale now that the catalog changed
+        if total_courses:
+            self.response_cache.clear()
+            self.tool_manager.clear_cache()
+
         return total_courses, total_chunks
 
     def query(
@@ -139,19 +162,80 @@ class RAGSystem:
         if session_id:
             history = self.session_manager.get_conversation_history(session_id)
 
-        # Generate response using AI with tools
-        response = self.ai_generator.generate_response(
-            query=prompt,
-            conversation_history=history,
-            tools=self.tool_manager.get_tool_definitions(),
-            tool_manager=self.tool_manager,
-        )
+        # Serve near-duplicate questions from the semantic cache
+        cache_key = self.response_cache.embed(query, history)
+        cached = self.response_cache.lookup(cache_key)
+        if cached:
+            response, sources = cached
+        else:
+            # Track sources per query so concurrent requests don't mix them
+            tool_scope = self.tool_manager.request_scope()
+
+            # Generate response using AI with tools
+            response = self.ai_generator.generate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=tool_scope.get_tool_definitions(),
+                tool_manager=tool_scope,
+            )
+
+            # Get sources from this query's tool calls
+            sources = tool_scope.get_last_sources()
+
+            if response != self.ai_generator.FALLBACK_RESPONSE:
+                self.response_cache.store(cache_key, query, response, sources)
+
+        # Update conversation history
+        if session_id:
+            self.session_manager.add_exchange(session_id, query, response)
+
+        # Return response with sources from tool searches
+        return response, sources
+
+    async def aquery(
+        self, query: str, session_id: Optional[str] = None
+    ) -> Tuple[str, List[str]]:
+        """
+        Async variant of query that awaits the AI generator instead of blocking
+        the calling event loop.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Returns:
+            Tuple of (response, sources list - empty for tool-based approach)
+        """
+        # Create prompt for the AI with clear instructions
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        # Get conversation history if session exists
+        history = None
+        if session_id:
+            history = self.session_manager.get_conversation_history(session_id)
 
-        # Get sources from the search tool
-        sources = self.tool_manager.get_last_sources()
+        # Serve near-duplicate questions from the semantic cache
+        cache_key = await asyncio.to_thread(self.response_cache.embed, query, history)
+        cached = self.response_cache.lookup(cache_key)
+        if cached:
+            response, sources = cached
+        else:
+            # Track sources per query so concurrent requests don't mix them
+            tool_scope = self.tool_manager.request_scope()
 
-        # Reset sources after retrieving them
-        self.tool_manager.reset_sources()
+            # Generate response using AI with tools
+            response = await self.ai_generator.agenerate_response(
+                query=prompt,
+                conversation_history=history,
+                tools=tool_scope.get_tool_definitions(),
+                tool_manager=tool_scope,
+            )
+
+            # Get sources from this query's tool calls
+            sources = tool_scope.get_last_sources()
+
+            if response != self.ai_generator.FALLBACK_RESPONSE:
+                self.response_cache.store(cache_key, query, response, sources)
 
         # Update conversation history
         if session_id:
@@ -160,6 +244,79 @@ class RAGSystem:
         # Return response with sources from tool searches
         return response, sources
 
+    async def aquery_stream(
+        self, query: str, session_id: Optional[str] = None
+    ) -> AsyncIterator[Dict]:
+        """
+        Streaming variant of aquery.
+
+        Args:
+            query: User's question
+            session_id: Optional session ID for conversation context
+
+        Yields:
+            {"type": "delta", "text": ...} events as the answer is generated,
+            {"type": "reset"} when the text streamed so far should be discarded,
+            then a single {"type": "done", "sources": [...]} event
+        """
+        # Create prompt for the AI with clear instructions
+        prompt = f"""Answer this question about course materials: {query}"""
+
+        # Get conversation history if session exists
+        history = None
+        if session_id:
+            history = self.session_manager.get_conversation_history(session_id)
+
+        # Serve near-duplicate questions from the semantic cache
+        cache_key = await asyncio.to_thread(self.response_cache.embed, query, history)
+        cached = self.response_cache.lookup(cache_key)
+
+        # Track sources per query so concurrent requests don't mix them
+        tool_scope = self.tool_manager.request_scope()
+
+        # Keep the full streamed text for history and the cache
+        chunks = []
+        completed = False
+        try:
+            if cached:
+                chunks.append(cached[0])
+                yield {"type": "delta", "text": cached[0]}
+            else:
+                # Stream response using AI with tools
+                async for text in self.ai_generator.agenerate_response_stream(
+                    query=prompt,
+                    conversation_history=history,
+                    tools=tool_scope.get_tool_definitions(),
+                    tool_manager=tool_scope,
+                ):
+                    if text is self.ai_generator.STREAM_RESET:
+                        # Text streamed so far was tool-use preamble
+                        chunks.clear()
+                        yield {"type": "reset"}
+                        continue
+                    chunks.append(text)
+                    yield {"type": "delta", "text": text}
+            completed = True
+        finally:
+            # Also runs when the client disconnects mid-stream
+            response = "".join(chunks)
+            sources = cached[1] if cached else tool_scope.get_last_sources()
+            tool_scope.reset_sources()
+
+            # Only cache complete answers
+            if (
+                completed
+                and not cached
+                and response != self.ai_generator.FALLBACK_RESPONSE
+            ):
+                self.response_cache.store(cache_key, query, response, sources)
+
+            # Update conversation history with whatever the user was shown
+            if session_id and response:
+                self.session_manager.add_exchange(session_id, query, response)
+
+        yield {"type": "done", "sources": sources}
+
     def get_course_analytics(self) -> Dict:
         """Get analytics about the course catalog"""
         return {
@@ -1,8 +1,20 @@
-from typing import Dict, Any, Optional, Protocol
+from typing import Dict, Any, List, Optional, Protocol
 from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass, field
+import threading
 from vector_store import VectorStore, SearchResults
 
 
+@dataclass
+class ToolResult:
+    """Output of one tool call together with the sources it cited"""
+
+    content: str
+    sources: List[Dict[str, Any]] = field(default_factory=list)
+    is_error: bool = False  # Failed lookups are never cached
+
+
 class Tool(ABC):
     """Abstract base class for all tools"""
 
@@ -12,10 +24,17 @@ class Tool(ABC):
         pass
 
     @abstractmethod
-    def execute(self, **kwargs) -> str:
-        """Execute the tool with given parameters"""
+    def run(self, **kwargs) -> ToolResult:
+        """Execute the tool without touching shared state"""
         pass
 
+    def execute(self, **kwargs) -> str:
+        """Execute the tool with given parameters, tracking its sources"""
+        result = self.run(**kwargs)
+        if result.sources:
+            self.last_sources = result.sources
+        return result.content
+
 
 class CourseSearchTool(Tool):
     """Tool for searching course content with semantic course name matching"""
@@ -49,12 +68,12 @@ class CourseSearchTool(Tool):
             },
         }
 
-    def execute(
+    def run(
         self,
         query: str,
         course_name: Optional[str] = None,
         lesson_number: Optional[int] = None,
-    ) -> str:
+    ) -> ToolResult:
         """
         Execute the search tool with given parameters.
 
@@ -64,7 +83,7 @@ class CourseSearchTool(Tool):
             lesson_number: Optional lesson filter
 
         Returns:
-            Formatted search results or error message
+            Formatted search results or error message, with cited sources
         """
 
         # Use the vector store's unified search interface
@@ -74,7 +93,7 @@ class CourseSearchTool(Tool):
 
         # Handle errors
         if results.error:
-            return results.error
+            return ToolResult(results.error, is_error=True)
 
         # Handle empty results
         if results.is_empty():
@@ -83,12 +102,12 @@ class CourseSearchTool(Tool):
                 filter_info += f" in course '{course_name}'"
             if lesson_number:
                 filter_info += f" in lesson {lesson_number}"
-            return f"No relevant content found{filter_info}."
+            return ToolResult(f"No relevant content found{filter_info}.")
 
         # Format and return results
         return self._format_results(results)
 
-    def _format_results(self, results: SearchResults) -> str:
+    def _format_results(self, results: SearchResults) -> ToolResult:
         """Format search results with course and lesson context"""
         formatted = []
         sources = []
@@ -119,9 +138,7 @@ class CourseSearchTool(Tool):
 
             sources.append({"name": source_name, "link": link})
 
-        self.last_sources = sources
-
-        return "\n\n".join(formatted)
+        return ToolResult("\n\n".join(formatted), sources)
 
 
 class CourseOutlineTool(Tool):
@@ -147,16 +164,17 @@ class CourseOutlineTool(Tool):
             },
         }
 
-    def execute(self, course_name: str) -> str:
+    def run(self, course_name: str) -> ToolResult:
         outline = self.store.get_course_outline(course_name)
 
         if not outline:
-            return f"No course found matching '{course_name}'."
+            # The store also reports lookup failures as a missing outline
+            return ToolResult(
+                f"No course found matching '{course_name}'.", is_error=True
+            )
 
-        # Track source for frontend display
-        self.last_sources = [
-            {"name": outline["title"], "link": outline.get("course_link")}
-        ]
+        # Source for frontend display
+        sources = [{"name": outline["title"], "link": outline.get("course_link")}]
 
         # Format readable output
         lines = [f"Course: {outline['title']}"]
@@ -167,15 +185,22 @@ class CourseOutlineTool(Tool):
         for lesson in outline["lessons"]:
             lines.append(f"  {lesson['lesson_number']}. {lesson['lesson_title']}")
 
-        return "\n".join(lines)
+        return ToolResult("\n".join(lines), sources)
 
 
 class ToolManager:
     """Manages available tools for the AI"""
 
+    MAX_CACHED_RESULTS = 256
+
     def __init__(self):
         self.tools = {}
 
+        # Recent results keyed by (tool name, input). Tools are deterministic
+        # for a given catalog, so repeated calls skip the vector store.
+        self._result_cache: OrderedDict = OrderedDict()
+        self._cache_lock = threading.Lock()  # Tools may run on worker threads
+
     def register_tool(self, tool: Tool):
         """Register any tool that implements the Tool interface"""
         tool_def = tool.get_tool_definition()
@@ -190,10 +215,53 @@ class ToolManager:
 
     def execute_tool(self, tool_name: str, **kwargs) -> str:
         """Execute a tool by name with given parameters"""
-        if tool_name not in self.tools:
-            return f"Tool '{tool_name}' not found"
+        result = self.run_tool(tool_name, **kwargs)
+        if result.sources:
+            self.tools[tool_name].last_sources = result.sources
+        return result.content
 
-        return self.tools[tool_name].execute(**kwargs)
+    def run_tool(self, tool_name: str, **kwargs) -> ToolResult:
+        """Execute a tool by name, returning its output and cited sources"""
+        if tool_name not in self.tools:
+            return ToolResult(f"Tool '{tool_name}' not found")
+
+        key = self._cache_key(tool_name, kwargs)
+        cached = None
+        if key is not None:
+            with self._cache_lock:
+                cached = self._result_cache.get(key)
+                if cached is not None:
+                    self._result_cache.move_to_end(key)
+
+        if cached is None:
+            cached = self.tools[tool_name].run(**kwargs)
+            if key is not None and not cached.is_error:
+                with self._cache_lock:
+                    self._result_cache[key] = cached
+                    if len(self._result_cache) > self.MAX_CACHED_RESULTS:
+                        self._result_cache.popitem(last=False)
+
+        # Copy so callers can't mutate the cached entry
+        return ToolResult(cached.content, list(cached.sources))
+
+    @staticmethod
+    def _cache_key(tool_name: str, kwargs: Dict[str, Any]) -> Optional[tuple]:
+        """Build a result-cache key, or None when the input isn't hashable"""
+        key = (tool_name, tuple(sorted(kwargs.items())))
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def request_scope(self) -> "ToolCallScope":
+        """Create a per-query view that tracks sources for that query only"""
+        return ToolCallScope(self)
+
+    def clear_cache(self):
+        """Drop cached tool results, e.g. after the course catalog changes"""
+        with self._cache_lock:
+            self._result_cache.clear()
 
     def get_last_sources(self) -> list:
         """Get sources from the last search operation"""
@@ -208,3 +276,54 @@ class ToolManager:
         for tool in self.tools.values():
             if hasattr(tool, "last_sources"):
                 tool.last_sources = []
+
+
+class ToolCallScope:
+    """
+    Tool manager view for a single query.
+
+    Sources are recorded on the scope rather than on the shared tool
+    instances, so concurrent queries never see each other's sources. Every
+    call's sources are kept, keyed by its input, so tools run in parallel
+    report the same sources however their calls finish.
+    """
+
+    def __init__(self, manager: ToolManager):
+        self.manager = manager
+        self._sources: Dict[str, Dict[str, list]] = {}  # tool -> input -> sources
+        self._lock = threading.Lock()  # Calls in one round run on worker threads
+
+    def get_tool_definitions(self) -> list:
+        """Get all tool definitions for Anthropic tool calling"""
+        return self.manager.get_tool_definitions()
+
+    def execute_tool(self, tool_name: str, **kwargs) -> str:
+        """Execute a tool by name and record its sources for this query"""
+        result = self.manager.run_tool(tool_name, **kwargs)
+        if result.sources:
+            call = repr(sorted(kwargs.items()))
+            with self._lock:
+                self._sources.setdefault(tool_name, {})[call] = result.sources
+        return result.content
+
+    def get_last_sources(self) -> list:
+        """Get sources from this query's searches, merged across calls"""
+        # Same precedence as ToolManager: registration order
+        for tool_name in self.manager.tools:
+            calls = self._sources.get(tool_name)
+            if not calls:
+                continue
+
+            # Merge in input order, not completion order, so results are stable
+            merged = []
+            for call in sorted(calls):
+                for source in calls[call]:
+                    if source not in merged:
+                        merged.append(source)
+            return merged
+        return []
+
+    def reset_sources(self):
+        """Reset sources recorded by this query"""
+        with self._lock:
+            self._sources.clear()
@@ -0,0 +1,110 @@
+import hashlib
+import re
+import threading
+from typing import Callable, List, Optional, Tuple
+
+import numpy as np
+
+
+class SemanticCache:
+    """Embedding-keyed response cache that serves near-duplicate queries"""
+
+    # Numbers and quoted terms that must match exactly: embeddings barely tell
+    # "lesson 1 of MCP" from "lesson 2 of MCP"
+    LITERAL_PATTERN = re.compile(r'\d+(?:\.\d+)?|"([^"]+)"|\u201c([^\u201d]+)\u201d')
+
+    def __init__(
+        self,
+        embed_fn: Callable[[List[str]], List],
+        threshold: float = 0.9,
+        max_entries: int = 1024,
+    ):
+        self.embed_fn = embed_fn
+        self.threshold = threshold
+        self.max_entries = max_entries
+
+        # Unit-norm key rows, allocated on first store once the dimension is known
+        self._embeddings: Optional[np.ndarray] = None
+        self._contexts = np.zeros(max_entries, dtype=np.int64)
+        self._entries: List[Optional[Tuple[str, str, list]]] = [None] * max_entries
+        self._size = 0
+        self._next = 0  # Ring-buffer slot to overwrite next (FIFO eviction)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _normalize(vector: np.ndarray) -> np.ndarray:
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    @classmethod
+    def _context_id(cls, query: str, conversation_history: Optional[str]) -> int:
+        literals = sorted(
+            {
+                m.group(1) or m.group(2) or m.group(0)
+                for m in cls.LITERAL_PATTERN.finditer(query)
+            }
+        )
+        if not conversation_history and not literals:
+            return 0
+        payload = "\x1f".join([conversation_history or "", *literals])
+        digest = hashlib.blake2b(payload.encode(), digest_size=8)
+        return int.from_bytes(digest.digest(), "little", signed=True)
+
+    def embed(
+        self, query: str, conversation_history: Optional[str] = None
+    ) -> Tuple[np.ndarray, int]:
+        """
+        Build the cache key for a query.
+
+        The key pairs the query embedding with a hash of the conversation
+        history and the query's numbers and quoted terms; only entries that
+        agree on all of those exactly can match.
+        """
+        vector = np.asarray(self.embed_fn([query])[0], dtype=np.float32)
+        return (
+            self._normalize(vector).astype(np.float32),
+            self._context_id(query, conversation_history),
+        )
+
+    def lookup(self, key: Tuple[np.ndarray, int]) -> Optional[Tuple[str, list]]:
+        """Return the cached (answer, sources) closest to key, if similar enough"""
+        vector, context = key
+        with self._lock:
+            if not self._size:
+                return None
+
+            # Rows and key are unit-norm, so one mat-vec gives cosine similarity
+            similarities = self._embeddings[: self._size] @ vector
+            similarities[self._contexts[: self._size] != context] = -np.inf
+            best = int(np.argmax(similarities))
+            if similarities[best] < self.threshold:
+                return None
+
+            _, answer, sources = self._entries[best]
+            return answer, list(sources)
+
+    def store(
+        self, key: Tuple[np.ndarray, int], query: str, answer: str, sources: list
+    ):
+        """Add a response to the cache, evicting the oldest entry when full"""
+        vector, context = key
+        with self._lock:
+            if self._embeddings is None:
+                self._embeddings = np.zeros(
+                    (self.max_entries, vector.shape[0]), dtype=np.float32
+                )
+
+            self._embeddings[self._next] = vector
+            self._contexts[self._next] = context
+            self._entries[self._next] = (query, answer, list(sources))
+            self._next = (self._next + 1) % self.max_entries
+            self._size = min(self._size + 1, self.max_entries)
+
+    def clear(self):
+        """Drop all cached responses"""
+        with self._lock:
+            self._embeddings = None
+            self._contexts[:] = 0
+            self._entries = [None] * self.max_entries
+            self._size = 0
+            self._next = 0
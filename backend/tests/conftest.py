@@ -1,10 +1,12 @@
 """Shared fixtures for backend tests."""
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 
 import pytest
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from fastapi.testclient import TestClient
+import orjson
 from pydantic import BaseModel
 from typing import List, Optional
 
@@ -43,10 +45,22 @@ class CourseStats(BaseModel):
 def mock_rag_system():
     """A MagicMock standing in for RAGSystem with sane defaults."""
     rag = MagicMock()
-    rag.query.return_value = (
-        "Test answer",
-        [{"name": "Course A", "link": "https://example.com"}],
+    rag.aquery = AsyncMock(
+        return_value=(
+            "Test answer",
+            [{"name": "Course A", "link": "https://example.com"}],
+        )
     )
+
+    async def aquery_stream(query, session_id):
+        yield {"type": "delta", "text": "Test "}
+        yield {"type": "delta", "text": "answer"}
+        yield {
+            "type": "done",
+            "sources": [{"name": "Course A", "link": "https://example.com"}],
+        }
+
+    rag.aquery_stream = MagicMock(side_effect=aquery_stream)
     rag.get_course_analytics.return_value = {
         "total_courses": 2,
         "course_titles": ["Course A", "Course B"],
@@ -59,28 +73,62 @@ def _build_test_app(rag_system):
     """Build a minimal FastAPI app whose endpoints mirror app.py but use
     an injected rag_system instead of a real one."""
 
-    test_app = FastAPI()
+    test_app = FastAPI(default_response_class=ORJSONResponse)
 
-    @test_app.post("/api/query", response_model=QueryResponse)
+    @test_app.post("/api/query", responses={200: {"model": QueryResponse}})
     async def query_documents(request: QueryRequest):
         try:
             session_id = request.session_id
             if not session_id:
                 session_id = rag_system.session_manager.create_session()
-            answer, sources = rag_system.query(request.query, session_id)
-            return QueryResponse(
-                answer=answer, sources=sources, session_id=session_id
+            answer, sources = await rag_system.aquery(request.query, session_id)
+            return ORJSONResponse(
+                {
+                    "answer": answer,
+                    "sources": [
+                        {"name": source["name"], "link": source.get("link")}
+                        for source in sources
+                    ],
+                    "session_id": session_id,
+                }
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
-    @test_app.get("/api/courses", response_model=CourseStats)
+    @test_app.post("/api/query/stream")
+    async def query_documents_stream(request: QueryRequest):
+        session_id = request.session_id
+        if not session_id:
+            session_id = rag_system.session_manager.create_session()
+
+        async def event_stream():
+            try:
+                async for event in rag_system.aquery_stream(request.query, session_id):
+                    if event["type"] == "done":
+                        event = {
+                            "type": "done",
+                            "sources": [
+                                {"name": source["name"], "link": source.get("link")}
+                                for source in event["sources"]
+                            ],
+                            "session_id": session_id,
+                        }
+                    yield b"data: " + orjson.dumps(event) + b"\n\n"
+            except Exception as e:
+                error = {"type": "error", "detail": str(e)}
+                yield b"data: " + orjson.dumps(error) + b"\n\n"
+
+        return StreamingResponse(event_stream(), media_type="text/event-stream")
+
+    @test_app.get("/api/courses", responses={200: {"model": CourseStats}})
     async def get_course_stats():
         try:
             analytics = rag_system.get_course_analytics()
-            return CourseStats(
-                total_courses=analytics["total_courses"],
-                course_titles=analytics["course_titles"],
+            return ORJSONResponse(
+                {
+                    "total_courses": analytics["total_courses"],
+                    "course_titles": analytics["course_titles"],
+                }
             )
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
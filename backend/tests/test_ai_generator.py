@@ -1,45 +1,98 @@
-import sys
-from pathlib import Path
-from unittest.mock import MagicMock, patch
+import asyncio
+from types import SimpleNamespace as NS
+from unittest.mock import AsyncMock, MagicMock, patch
 
+import anthropic
 import pytest
 
-# Add backend/ to path so we can import ai_generator directly
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+# backend/ is on sys.path via pytest's `pythonpath` setting in pyproject.toml
 from ai_generator import AIGenerator
 
 # --- Helpers to build mock response objects ---
 
 
 def make_text_block(text="Hello"):
-    block = MagicMock()
-    block.type = "text"
-    block.text = text
-    return block
+    return NS(type="text", text=text)
 
 
 def make_tool_use_block(
     name="search_course_content", tool_id="tool_1", tool_input=None
 ):
-    block = MagicMock()
-    block.type = "tool_use"
-    block.name = name
-    block.id = tool_id
-    block.input = tool_input or {"query": "test"}
-    return block
+    return NS(
+        type="tool_use", name=name, id=tool_id, input=tool_input or {"query": "test"}
+    )
 
 
 def make_response(stop_reason="end_turn", content=None):
-    resp = MagicMock()
-    resp.stop_reason = stop_reason
-    resp.content = content or [make_text_block()]
-    return resp
+    return NS(stop_reason=stop_reason, content=content or [make_text_block()])
 
 
-@pytest.fixture
+class FakeStream:
+    """Async context manager mimicking AsyncAnthropic's messages.stream()."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    @property
+    async def text_stream(self):
+        for block in self.response.content:
+            if block.type == "text":
+                for word in block.text.split(" "):
+                    yield word + " "
+
+    async def get_final_message(self):
+        return self.response
+
+
+async def collect(stream):
+    return [chunk async for chunk in stream]
+
+
+def final_text(chunks):
+    """Text a client is left with after applying STREAM_RESET markers."""
+    text = ""
+    for chunk in chunks:
+        text = "" if chunk is AIGenerator.STREAM_RESET else text + chunk
+    return text
+
+
+@pytest.fixture(scope="module")
 def generator():
-    with patch("ai_generator.anthropic.Anthropic"):
-        gen = AIGenerator(api_key="test-key", model="test-model")
+    """One patched generator shared by the module; see _reset_generator."""
+    with (
+        patch("ai_generator.anthropic.Anthropic"),
+        patch("ai_generator.anthropic.AsyncAnthropic"),
+        patch.dict(AIGenerator._clients, clear=True),
+        patch.dict(AIGenerator._aclients, clear=True),
+    ):
+        yield AIGenerator(api_key="test-key", model="test-model")
+
+
+@pytest.fixture(autouse=True)
+def _reset_generator(generator):
+    """Clear calls, return values and side effects left by the previous test."""
+    generator.client.reset_mock(return_value=True, side_effect=True)
+    generator.aclient.reset_mock(return_value=True, side_effect=True)
+    yield
+
+
+@pytest.fixture
+def cascade_generator():
+    with (
+        patch("ai_generator.anthropic.Anthropic"),
+        patch("ai_generator.anthropic.AsyncAnthropic"),
+        patch.dict(AIGenerator._clients, clear=True),
+        patch.dict(AIGenerator._aclients, clear=True),
+    ):
+        gen = AIGenerator(
+            api_key="test-key", model="strong-model", fast_model="fast-model"
+        )
     return gen
 
 
@@ -58,6 +111,45 @@ DUMMY_TOOLS = [
 # --- Tests ---
 
 
+class TestSharedClients:
+    def test_instances_share_client_per_api_key(self):
+        """Same api_key -> one client; different api_key -> separate client."""
+        with (
+            patch("ai_generator.anthropic.Anthropic") as mock_cls,
+            patch("ai_generator.anthropic.AsyncAnthropic"),
+            patch.dict(AIGenerator._clients, clear=True),
+            patch.dict(AIGenerator._aclients, clear=True),
+        ):
+            mock_cls.side_effect = lambda **kwargs: MagicMock()
+            first = AIGenerator(api_key="key-a", model="m")
+            second = AIGenerator(api_key="key-a", model="m")
+            other = AIGenerator(api_key="key-b", model="m")
+
+        assert first.client is second.client
+        assert first.aclient is second.aclient
+        assert first.client is not other.client
+        # The tool thread pool is shared rather than created per instance
+        assert first._tool_pool is other._tool_pool
+
+    def test_clients_build_on_sdk_default_http_clients(self):
+        """Custom transports keep the SDK's keepalive and pool defaults."""
+        with (
+            patch("ai_generator.anthropic.Anthropic") as mock_cls,
+            patch("ai_generator.anthropic.AsyncAnthropic") as mock_async_cls,
+            patch.dict(AIGenerator._clients, clear=True),
+            patch.dict(AIGenerator._aclients, clear=True),
+        ):
+            AIGenerator(api_key="key-a", model="m")
+
+        http_client = mock_cls.call_args.kwargs["http_client"]
+        async_http_client = mock_async_cls.call_args.kwargs["http_client"]
+        assert isinstance(http_client, anthropic.DefaultHttpxClient)
+        assert isinstance(async_http_client, anthropic.DefaultAsyncHttpxClient)
+        assert http_client.follow_redirects is True
+        # Long-lived streams keep the SDK's default read timeout
+        assert http_client.timeout.read == 600
+
+
 class TestDirectResponses:
     def test_direct_response_no_tools(self, generator):
         """No tools provided -> single API call, text returned."""
@@ -114,6 +206,37 @@ class TestSingleToolRound:
             "search_course_content", query="AI"
         )
 
+    def test_multiple_tools_in_one_round_keep_order(self, generator, mock_tool_manager):
+        """Several tool_use blocks in one response -> results align with block ids."""
+        tool_resp = make_response(
+            stop_reason="tool_use",
+            content=[
+                make_tool_use_block("get_course_outline", "t1", {"course_name": "A"}),
+                make_tool_use_block("search_course_content", "t2", {"query": "B"}),
+            ],
+        )
+        final_resp = make_response(content=[make_text_block("Both")])
+        generator.client.messages.create = MagicMock(
+            side_effect=[tool_resp, final_resp]
+        )
+        mock_tool_manager.execute_tool = MagicMock(
+            side_effect=lambda name, **kwargs: f"{name} result"
+        )
+
+        result = generator.generate_response(
+            "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+        )
+
+        assert result == "Both"
+        assert mock_tool_manager.execute_tool.call_count == 2
+        second_call_messages = generator.client.messages.create.call_args_list[1][1][
+            "messages"
+        ]
+        tool_results = second_call_messages[2]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2"]
+        assert tool_results[0]["content"] == "get_course_outline result"
+        assert tool_results[1]["content"] == "search_course_content result"
+
 
 class TestTwoSequentialToolRounds:
     def test_two_sequential_tool_rounds(self, generator, mock_tool_manager):
@@ -257,8 +380,41 @@ class TestSystemPromptAndExtraction:
         )
 
         call_kwargs = generator.client.messages.create.call_args[1]
-        assert "Previous conversation:" in call_kwargs["system"]
-        assert "User: hi" in call_kwargs["system"]
+        history_block = call_kwargs["system"][-1]
+        assert "Previous conversation:" in history_block["text"]
+        assert "User: hi" in history_block["text"]
+        assert "cache_control" not in history_block
+
+    def test_system_prompt_marked_for_caching(self, generator):
+        """Static system prompt is sent as a cache_control text block."""
+        text_resp = make_response(content=[make_text_block("answer")])
+        generator.client.messages.create = MagicMock(return_value=text_resp)
+
+        generator.generate_response("question")
+
+        call_kwargs = generator.client.messages.create.call_args[1]
+        assert call_kwargs["system"] == [
+            {
+                "type": "text",
+                "text": AIGenerator.SYSTEM_PROMPT,
+                "cache_control": {"type": "ephemeral"},
+            }
+        ]
+
+    def test_tool_use_without_tool_blocks_stops(self, generator, mock_tool_manager):
+        """stop_reason tool_use but no tool_use blocks -> no follow-up call."""
+        resp = make_response(
+            stop_reason="tool_use", content=[make_text_block("Only text")]
+        )
+        generator.client.messages.create = MagicMock(return_value=resp)
+
+        result = generator.generate_response(
+            "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+        )
+
+        assert result == "Only text"
+        assert generator.client.messages.create.call_count == 1
+        mock_tool_manager.execute_tool.assert_not_called()
 
     def test_text_extraction_from_mixed_content(self, generator):
         """TextBlock not at index 0 -> still found correctly."""
@@ -270,3 +426,245 @@ class TestSystemPromptAndExtraction:
         result = generator.generate_response("query")
 
         assert result == "The real answer"
+
+
+class TestModelCascade:
+    def test_cascade_answers_with_fast_model(self, cascade_generator):
+        """Confident fast-model answer -> returned without escalation."""
+        text_resp = make_response(content=[make_text_block("AI is...")])
+        cascade_generator.client.messages.create = MagicMock(return_value=text_resp)
+
+        result = cascade_generator.generate_response("What is AI?")
+
+        assert result == "AI is..."
+        assert cascade_generator.client.messages.create.call_count == 1
+        call_kwargs = cascade_generator.client.messages.create.call_args[1]
+        assert call_kwargs["model"] == "fast-model"
+
+    def test_cascade_escalates_on_tool_use(self, cascade_generator, mock_tool_manager):
+        """Fast model wants a tool -> redo with the strong model, then tool loop."""
+        fast_resp = make_response(
+            stop_reason="tool_use", content=[make_tool_use_block(tool_id="f1")]
+        )
+        strong_resp = make_response(
+            stop_reason="tool_use", content=[make_tool_use_block(tool_id="s1")]
+        )
+        final_resp = make_response(content=[make_text_block("Strong answer")])
+        cascade_generator.client.messages.create = MagicMock(
+            side_effect=[fast_resp, strong_resp, final_resp]
+        )
+
+        result = cascade_generator.generate_response(
+            "Search AI", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+        )
+
+        assert result == "Strong answer"
+        models = [
+            c[1]["model"]
+            for c in cascade_generator.client.messages.create.call_args_list
+        ]
+        assert models == ["fast-model", "strong-model", "strong-model"]
+        mock_tool_manager.execute_tool.assert_called_once()
+        tool_results = cascade_generator.client.messages.create.call_args_list[2][1][
+            "messages"
+        ][2]["content"]
+        assert tool_results[0]["tool_use_id"] == "s1"
+
+    def test_cascade_escalates_on_uncertainty(self, cascade_generator):
+        """Fast model hedges -> strong model answer is returned."""
+        unsure_resp = make_response(content=[make_text_block("I'm not sure.")])
+        strong_resp = make_response(content=[make_text_block("Definitive")])
+        cascade_generator.client.messages.create = MagicMock(
+            side_effect=[unsure_resp, strong_resp]
+        )
+
+        result = cascade_generator.generate_response("Hard question")
+
+        assert result == "Definitive"
+        assert cascade_generator.client.messages.create.call_count == 2
+
+
+class TestBatchResponses:
+    def test_generate_batch_maps_results_by_custom_id(self, generator):
+        """Results come back out of order -> mapped to query order; failures fall back."""
+        batches = generator.client.messages.batches
+        batches.create.return_value = MagicMock(id="b1", processing_status="ended")
+        succeeded = MagicMock(custom_id="q1")
+        succeeded.result.type = "succeeded"
+        succeeded.result.message = make_response(content=[make_text_block("Two")])
+        errored = MagicMock(custom_id="q0")
+        errored.result.type = "errored"
+        batches.results.return_value = [succeeded, errored]
+
+        result = generator.generate_batch(["one", "two"])
+
+        assert result == [AIGenerator.FALLBACK_RESPONSE, "Two"]
+        requests = batches.create.call_args[1]["requests"]
+        assert [r["custom_id"] for r in requests] == ["q0", "q1"]
+        assert "tools" not in requests[0]["params"]
+        assert requests[1]["params"]["messages"] == [{"role": "user", "content": "two"}]
+        batches.results.assert_called_once_with("b1")
+
+
+class TestAsyncResponses:
+    def test_async_direct_response(self, generator):
+        """Async path returns text from a single awaited API call."""
+        text_resp = make_response(content=[make_text_block("Async answer")])
+        generator.aclient.messages.create = AsyncMock(return_value=text_resp)
+
+        result = asyncio.run(generator.agenerate_response("What is AI?"))
+
+        assert result == "Async answer"
+        assert generator.aclient.messages.create.await_count == 1
+
+    def test_async_tool_round(self, generator, mock_tool_manager):
+        """Async path executes tools and sends results in a follow-up call."""
+        tool_resp = make_response(
+            stop_reason="tool_use",
+            content=[
+                make_tool_use_block("search_course_content", "t1", {"query": "AI"}),
+                make_tool_use_block("get_course_outline", "t2", {"course_name": "X"}),
+            ],
+        )
+        final_resp = make_response(content=[make_text_block("Async tools")])
+        generator.aclient.messages.create = AsyncMock(
+            side_effect=[tool_resp, final_resp]
+        )
+
+        def execute_tool(name, **kwargs):
+            if name == "search_course_content":
+                raise RuntimeError("boom")
+            return "outline"
+
+        mock_tool_manager.execute_tool = MagicMock(side_effect=execute_tool)
+
+        result = asyncio.run(
+            generator.agenerate_response(
+                "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+            )
+        )
+
+        assert result == "Async tools"
+        assert generator.aclient.messages.create.await_count == 2
+        tool_results = generator.aclient.messages.create.call_args_list[1][1][
+            "messages"
+        ][2]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2"]
+        assert tool_results[0]["is_error"] is True
+        assert tool_results[1]["content"] == "outline"
+
+
+class TestStreamingResponses:
+    def test_stream_yields_text_after_tool_round(self, generator, mock_tool_manager):
+        """Tool turn is dispatched from the final message, then answer is streamed."""
+        tool_resp = make_response(
+            stop_reason="tool_use",
+            content=[make_tool_use_block("search_course_content", "t1")],
+        )
+        final_resp = make_response(content=[make_text_block("Streamed answer")])
+        streams = iter([FakeStream(tool_resp), FakeStream(final_resp)])
+        generator.aclient.messages.stream = MagicMock(
+            side_effect=lambda **kwargs: next(streams)
+        )
+
+        chunks = asyncio.run(
+            collect(
+                generator.agenerate_response_stream(
+                    "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+                )
+            )
+        )
+
+        assert "".join(chunks) == "Streamed answer "
+        assert generator.aclient.messages.stream.call_count == 2
+        mock_tool_manager.execute_tool.assert_called_once_with(
+            "search_course_content", query="test"
+        )
+
+    def test_stream_voids_tool_turn_preamble(self, generator, mock_tool_manager):
+        """Text beside a tool_use block is reset, as agenerate_response drops it."""
+        tool_resp = make_response(
+            stop_reason="tool_use",
+            content=[
+                make_text_block("Let me search."),
+                make_tool_use_block("search_course_content", "t1"),
+            ],
+        )
+        final_resp = make_response(content=[make_text_block("Answer")])
+        streams = iter([FakeStream(tool_resp), FakeStream(final_resp)])
+        generator.aclient.messages.stream = MagicMock(
+            side_effect=lambda **kwargs: next(streams)
+        )
+
+        chunks = asyncio.run(
+            collect(
+                generator.agenerate_response_stream(
+                    "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+                )
+            )
+        )
+
+        assert AIGenerator.STREAM_RESET in chunks
+        assert final_text(chunks).strip() == "Answer"
+
+    @pytest.mark.parametrize("with_tool_round", [False, True])
+    def test_stream_yields_before_turn_completes(
+        self, generator, mock_tool_manager, with_tool_round
+    ):
+        """Deltas reach the caller before the turn's final message is read."""
+        log = []
+
+        class LoggingStream(FakeStream):
+            async def get_final_message(self):
+                log.append("final")
+                return self.response
+
+        responses = [make_response(content=[make_text_block("Live answer")])]
+        if with_tool_round:
+            responses.insert(
+                0,
+                make_response(stop_reason="tool_use", content=[make_tool_use_block()]),
+            )
+        streams = iter([LoggingStream(r) for r in responses])
+        generator.aclient.messages.stream = MagicMock(
+            side_effect=lambda **kwargs: next(streams)
+        )
+
+        async def consume():
+            async for chunk in generator.agenerate_response_stream(
+                "query", tools=DUMMY_TOOLS, tool_manager=mock_tool_manager
+            ):
+                log.append(chunk)
+
+        asyncio.run(consume())
+
+        expected = ["Live ", "answer ", "final"]
+        assert log == (["final"] + expected if with_tool_round else expected)
+
+    def test_stream_cascade_resets_on_escalation(self, cascade_generator):
+        """Uncertain fast-model stream is reset and replaced by the strong model's."""
+        answers = {"fast-model": "I'm not sure", "strong-model": "Sure answer"}
+        cascade_generator.aclient.messages.stream = MagicMock(
+            side_effect=lambda **kwargs: FakeStream(
+                make_response(content=[make_text_block(answers[kwargs["model"]])])
+            )
+        )
+
+        chunks = asyncio.run(
+            collect(cascade_generator.agenerate_response_stream("Hard question"))
+        )
+
+        assert chunks[:3] == ["I'm ", "not ", "sure "]
+        assert chunks[3] is AIGenerator.STREAM_RESET
+        assert final_text(chunks).strip() == "Sure answer"
+
+    def test_stream_falls_back_when_no_text(self, generator):
+        """No text streamed -> fallback message yielded."""
+        empty_resp = make_response(content=[make_tool_use_block()])
+        generator.aclient.messages.stream = MagicMock(
+            return_value=FakeStream(empty_resp)
+        )
+
+        chunks = asyncio.run(collect(generator.agenerate_response_stream("query")))
+
+        assert chunks == [AIGenerator.FALLBACK_RESPONSE]
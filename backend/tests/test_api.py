@@ -1,5 +1,7 @@
 """Tests for FastAPI API endpoints (/api/query, /api/courses, /)."""
 
+import json
+
 import pytest
 
 
@@ -10,7 +12,7 @@ import pytest
 class TestQueryEndpoint:
 
     def test_query_with_session_id(self, client, mock_rag_system):
-        """Existing session_id is forwarded to RAGSystem.query."""
+        """Existing session_id is forwarded to RAGSystem.aquery."""
         resp = client.post(
             "/api/query",
             json={"query": "What is AI?", "session_id": "session_42"},
@@ -22,7 +24,7 @@ class TestQueryEndpoint:
         assert len(data["sources"]) == 1
         assert data["sources"][0]["name"] == "Course A"
 
-        mock_rag_system.query.assert_called_once_with("What is AI?", "session_42")
+        mock_rag_system.aquery.assert_called_once_with("What is AI?", "session_42")
         mock_rag_system.session_manager.create_session.assert_not_called()
 
     def test_query_without_session_id(self, client, mock_rag_system):
@@ -53,14 +55,14 @@ class TestQueryEndpoint:
 
     def test_query_server_error(self, client, mock_rag_system):
         """RAGSystem raises -> endpoint returns 500 with detail."""
-        mock_rag_system.query.side_effect = RuntimeError("DB down")
+        mock_rag_system.aquery.side_effect = RuntimeError("DB down")
         resp = client.post("/api/query", json={"query": "fail"})
         assert resp.status_code == 500
         assert "DB down" in resp.json()["detail"]
 
     def test_query_sources_with_no_link(self, client, mock_rag_system):
         """Sources may omit the link field."""
-        mock_rag_system.query.return_value = (
+        mock_rag_system.aquery.return_value = (
             "Answer",
             [{"name": "Course X"}],
         )
@@ -70,12 +72,64 @@ class TestQueryEndpoint:
 
     def test_query_empty_sources(self, client, mock_rag_system):
         """No sources returned -> empty list in response."""
-        mock_rag_system.query.return_value = ("Direct answer", [])
+        mock_rag_system.aquery.return_value = ("Direct answer", [])
         resp = client.post("/api/query", json={"query": "general"})
         assert resp.status_code == 200
         assert resp.json()["sources"] == []
 
 
+# ---------------------------------------------------------------------------
+# POST /api/query/stream
+# ---------------------------------------------------------------------------
+
+def parse_sse(body):
+    """Split a text/event-stream body into decoded JSON events."""
+    return [
+        json.loads(line[len("data: "):])
+        for line in body.splitlines()
+        if line.startswith("data: ")
+    ]
+
+
+class TestQueryStreamEndpoint:
+
+    def test_stream_yields_deltas_then_done(self, client, mock_rag_system):
+        """Deltas arrive in order, followed by sources and session_id."""
+        resp = client.post(
+            "/api/query/stream",
+            json={"query": "What is AI?", "session_id": "session_42"},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["content-type"].startswith("text/event-stream")
+
+        events = parse_sse(resp.text)
+        assert [e["text"] for e in events if e["type"] == "delta"] == [
+            "Test ",
+            "answer",
+        ]
+        assert events[-1] == {
+            "type": "done",
+            "sources": [{"name": "Course A", "link": "https://example.com"}],
+            "session_id": "session_42",
+        }
+        mock_rag_system.aquery_stream.assert_called_once_with(
+            "What is AI?", "session_42"
+        )
+
+    def test_stream_without_session_id(self, client, mock_rag_system):
+        """No session_id -> a new session is created and reported in done."""
+        resp = client.post("/api/query/stream", json={"query": "Hello"})
+        assert parse_sse(resp.text)[-1]["session_id"] == "session_new"
+        mock_rag_system.session_manager.create_session.assert_called_once()
+
+    def test_stream_error_event(self, client, mock_rag_system):
+        """Failure mid-stream -> error event instead of an HTTP 500."""
+        mock_rag_system.aquery_stream.side_effect = RuntimeError("DB down")
+        resp = client.post("/api/query/stream", json={"query": "fail"})
+        assert resp.status_code == 200
+        assert parse_sse(resp.text) == [{"type": "error", "detail": "DB down"}]
+
+
 # ---------------------------------------------------------------------------
 # GET /api/courses
 # ---------------------------------------------------------------------------
@@ -0,0 +1,159 @@
+"""Tests for RAGSystem query orchestration."""
+
+import asyncio
+from unittest.mock import MagicMock, patch
+
+import numpy as np
+import pytest
+
+from config import Config
+from rag_system import RAGSystem
+from vector_store import SearchResults
+
+# Orthogonal embeddings so the semantic cache never conflates the queries
+VECTORS = {
+    "question A": [1.0, 0.0],
+    "question B": [0.0, 1.0],
+}
+
+
+def fake_embed(texts):
+    return [np.array(VECTORS[t], dtype=np.float32) for t in texts]
+
+
+def search_results(query, **kwargs):
+    """One hit per search, titled after the search query."""
+    return SearchResults(
+        documents=[f"content for {query}"],
+        metadata=[{"course_title": f"Course {query}"}],
+        distances=[0.1],
+    )
+
+
+@pytest.fixture
+def rag_system():
+    with (
+        patch("rag_system.VectorStore") as mock_store_cls,
+        patch("rag_system.AIGenerator") as mock_generator_cls,
+    ):
+        store = mock_store_cls.return_value
+        store.embedding_function = fake_embed
+        store.search.side_effect = search_results
+        store.get_course_link.return_value = None
+
+        mock_generator_cls.return_value.FALLBACK_RESPONSE = "fallback"
+        yield RAGSystem(Config())
+
+
+class TestResponseCache:
+    def test_hit_skips_generator(self, rag_system):
+        """Cached question -> cached answer and sources, no LLM call."""
+        sources = [{"name": "Course A", "link": None}]
+        cache = rag_system.response_cache
+        cache.store(cache.embed("question A"), "question A", "cached answer", sources)
+
+        assert rag_system.query("question A") == ("cached answer", sources)
+        assert asyncio.run(rag_system.aquery("question A")) == (
+            "cached answer",
+            sources,
+        )
+        rag_system.ai_generator.generate_response.assert_not_called()
+        rag_system.ai_generator.agenerate_response.assert_not_called()
+
+    def test_miss_stores_answer(self, rag_system):
+        """Generated answer is cached, so a repeat skips the generator."""
+        rag_system.ai_generator.generate_response.return_value = "answer A"
+
+        first = rag_system.query("question A")
+        second = rag_system.query("question A")
+
+        assert first == second == ("answer A", [])
+        assert rag_system.ai_generator.generate_response.call_count == 1
+
+    def test_fallback_not_stored(self, rag_system):
+        """FALLBACK_RESPONSE is returned but never cached."""
+        rag_system.ai_generator.generate_response.return_value = "fallback"
+
+        assert rag_system.query("question A") == ("fallback", [])
+        cache_key = rag_system.response_cache.embed("question A")
+        assert rag_system.response_cache.lookup(cache_key) is None
+
+
+class TestConcurrentQueries:
+    def test_overlapping_queries_keep_their_own_sources(self, rag_system):
+        """A's tool runs, B runs to completion, then A finishes -> no mixing."""
+
+        async def agenerate_response(query, tool_manager, **kwargs):
+            topic = "A" if "question A" in query else "B"
+            tool_manager.execute_tool("search_course_content", query=topic)
+            if topic == "A":
+                await b_finished.wait()
+            else:
+                b_finished.set()
+            return f"answer {topic}"
+
+        rag_system.ai_generator.agenerate_response = MagicMock(
+            side_effect=agenerate_response
+        )
+
+        async def run_both():
+            return await asyncio.gather(
+                rag_system.aquery("question A"), rag_system.aquery("question B")
+            )
+
+        b_finished = asyncio.Event()
+        (answer_a, sources_a), (answer_b, sources_b) = asyncio.run(run_both())
+
+        assert answer_a == "answer A"
+        assert sources_a == [{"name": "Course A", "link": None}]
+        assert answer_b == "answer B"
+        assert sources_b == [{"name": "Course B", "link": None}]
+
+
+class TestQueryStream:
+    def test_disconnect_records_partial_answer(self, rag_system):
+        """Client goes away mid-stream -> history updated, nothing cached."""
+
+        async def agenerate_response_stream(query, tool_manager, **kwargs):
+            tool_manager.execute_tool("search_course_content", query="A")
+            yield "Partial "
+            yield "answer"
+
+        rag_system.ai_generator.agenerate_response_stream = agenerate_response_stream
+        session_id = rag_system.session_manager.create_session()
+
+        async def read_first_delta():
+            stream = rag_system.aquery_stream("question A", session_id)
+            first = await anext(stream)
+            await stream.aclose()
+            return first
+
+        assert asyncio.run(read_first_delta()) == {"type": "delta", "text": "Partial "}
+        assert "Partial" in rag_system.session_manager.get_conversation_history(
+            session_id
+        )
+        cache_key = rag_system.response_cache.embed("question A")
+        assert rag_system.response_cache.lookup(cache_key) is None
+
+    def test_reset_discards_preamble(self, rag_system):
+        """Text before STREAM_RESET is neither kept in history nor cached."""
+        reset = rag_system.ai_generator.STREAM_RESET
+
+        async def agenerate_response_stream(query, tool_manager, **kwargs):
+            yield "Let me search."
+            yield reset
+            yield "Answer"
+
+        rag_system.ai_generator.agenerate_response_stream = agenerate_response_stream
+        session_id = rag_system.session_manager.create_session()
+
+        async def read_all():
+            return [e async for e in rag_system.aquery_stream("question A", session_id)]
+
+        events = asyncio.run(read_all())
+
+        assert [e["type"] for e in events] == ["delta", "reset", "delta", "done"]
+        history = rag_system.session_manager.get_conversation_history(session_id)
+        assert "Answer" in history and "Let me search." not in history
+        cache_key = rag_system.response_cache.embed("question A")
+        assert rag_system.response_cache.lookup(cache_key) == ("Answer", [])
@@ -0,0 +1,123 @@
+"""Tests for ToolManager's tool-result cache and per-query scopes."""
+
+import time
+from types import SimpleNamespace as NS
+from typing import Any, Dict
+from unittest.mock import patch
+
+import pytest
+
+from ai_generator import AIGenerator
+from search_tools import Tool, ToolManager, ToolResult
+
+
+class CountingTool(Tool):
+    """Echo tool that records every real execution."""
+
+    def __init__(self, is_error=False):
+        self.is_error = is_error
+        self.delays = {}  # Seconds to sleep per query
+        self.calls = []
+        self.last_sources = []
+
+    def get_tool_definition(self) -> Dict[str, Any]:
+        return {"name": "echo", "description": "Echo the query", "input_schema": {}}
+
+    def run(self, query, **kwargs) -> ToolResult:
+        time.sleep(self.delays.get(query, 0))
+        self.calls.append(query)
+        return ToolResult(
+            f"result for {query}", [{"name": query, "link": None}], self.is_error
+        )
+
+
+@pytest.fixture
+def tool():
+    return CountingTool()
+
+
+@pytest.fixture
+def manager(tool):
+    manager = ToolManager()
+    manager.register_tool(tool)
+    return manager
+
+
+class TestToolResultCache:
+    def test_hit_skips_execution(self, manager, tool):
+        first = manager.execute_tool("echo", query="mcp")
+        second = manager.execute_tool("echo", query="mcp")
+
+        assert first == second == "result for mcp"
+        assert tool.calls == ["mcp"]
+
+    def test_hit_replays_sources(self, manager, tool):
+        manager.execute_tool("echo", query="mcp")
+        manager.reset_sources()
+
+        manager.execute_tool("echo", query="mcp")
+
+        assert manager.get_last_sources() == [{"name": "mcp", "link": None}]
+        assert tool.calls == ["mcp"]
+
+    def test_lru_eviction(self, manager, tool, monkeypatch):
+        """Beyond MAX_CACHED_RESULTS the least recently used result is dropped."""
+        monkeypatch.setattr(ToolManager, "MAX_CACHED_RESULTS", 2)
+        manager.execute_tool("echo", query="a")
+        manager.execute_tool("echo", query="b")
+        manager.execute_tool("echo", query="a")  # Refresh "a"
+        manager.execute_tool("echo", query="c")  # Evicts "b"
+
+        manager.execute_tool("echo", query="a")
+        manager.execute_tool("echo", query="b")
+
+        assert tool.calls == ["a", "b", "c", "b"]
+
+    def test_clear_cache(self, manager, tool):
+        manager.execute_tool("echo", query="mcp")
+        manager.clear_cache()
+        manager.execute_tool("echo", query="mcp")
+
+        assert tool.calls == ["mcp", "mcp"]
+
+    def test_errors_not_cached(self, manager, tool):
+        tool.is_error = True
+        manager.execute_tool("echo", query="mcp")
+        manager.execute_tool("echo", query="mcp")
+
+        assert tool.calls == ["mcp", "mcp"]
+
+    def test_unhashable_input_skips_cache(self, manager, tool):
+        """List-valued input can't be a dict key -> tool runs uncached."""
+        manager.execute_tool("echo", query="mcp", lessons=[1, 2])
+        result = manager.execute_tool("echo", query="mcp", lessons=[1, 2])
+
+        assert result == "result for mcp"
+        assert tool.calls == ["mcp", "mcp"]
+
+
+class TestToolCallScope:
+    def test_parallel_calls_report_stable_sources(self, manager, tool):
+        """Same-tool blocks finishing in any order -> same merged sources."""
+        tool.delays = {"slow": 0.05}
+        with (
+            patch("ai_generator.anthropic.Anthropic"),
+            patch("ai_generator.anthropic.AsyncAnthropic"),
+            patch.dict(AIGenerator._clients, clear=True),
+            patch.dict(AIGenerator._aclients, clear=True),
+        ):
+            generator = AIGenerator(api_key="test-key", model="test-model")
+
+        def sources_for(queries):
+            manager.clear_cache()  # Make every call really run
+            scope = manager.request_scope()
+            blocks = [
+                NS(name="echo", id=f"t{i}", input={"query": q})
+                for i, q in enumerate(queries)
+            ]
+            generator._execute_tools(blocks, scope)
+            return scope.get_last_sources()
+
+        expected = [{"name": "fast", "link": None}, {"name": "slow", "link": None}]
+        assert sources_for(["slow", "fast"]) == expected
+        assert sources_for(["fast", "slow"]) == expected
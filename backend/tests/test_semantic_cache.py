@@ -0,0 +1,107 @@
+"""Tests for the embedding-keyed SemanticCache."""
+
+import numpy as np
+import pytest
+
+from semantic_cache import SemanticCache
+
+# Fixed embeddings per text so similarity is fully controlled by the test
+VECTORS = {
+    "what is mcp": [1.0, 0.0, 0.0],
+    "explain mcp": [0.95, 0.05, 0.0],
+    "outline of rag course": [0.0, 1.0, 0.0],
+    "history A": [0.0, 0.0, 1.0],
+    "history B": [0.0, 1.0, 0.0],
+    "lesson 1 of mcp": [1.0, 0.0, 0.0],
+    "lesson 2 of mcp": [0.99, 0.01, 0.0],
+    "mcp lesson 1": [0.98, 0.02, 0.0],
+    'what is "tool use"': [1.0, 0.0, 0.0],
+    'what is "tool calling"': [0.99, 0.01, 0.0],
+}
+
+
+def fake_embed(texts):
+    return [np.array(VECTORS[t], dtype=np.float32) for t in texts]
+
+
+@pytest.fixture
+def cache():
+    return SemanticCache(fake_embed, threshold=0.9, max_entries=2)
+
+
+class TestSemanticCache:
+    def test_empty_cache_misses(self, cache):
+        assert cache.lookup(cache.embed("what is mcp")) is None
+
+    def test_near_duplicate_hits(self, cache):
+        """Similar query above threshold -> cached answer and sources returned."""
+        cache.store(
+            cache.embed("what is mcp"), "what is mcp", "MCP is...", [{"name": "A"}]
+        )
+
+        assert cache.lookup(cache.embed("explain mcp")) == (
+            "MCP is...",
+            [{"name": "A"}],
+        )
+
+    def test_dissimilar_query_misses(self, cache):
+        cache.store(cache.embed("what is mcp"), "what is mcp", "MCP is...", [])
+
+        assert cache.lookup(cache.embed("outline of rag course")) is None
+
+    def test_history_changes_key(self, cache):
+        """Same question under a different conversation -> no hit."""
+        key = cache.embed("what is mcp", "history A")
+        cache.store(key, "what is mcp", "In context A", [])
+
+        assert cache.lookup(cache.embed("what is mcp", "history A")) == (
+            "In context A",
+            [],
+        )
+        assert cache.lookup(cache.embed("what is mcp", "history B")) is None
+
+    def test_history_and_no_history_dont_mix(self, cache):
+        """A follow-up never reuses a fresh-conversation answer, or vice versa."""
+        cache.store(cache.embed("what is mcp"), "what is mcp", "Fresh", [])
+        cache.store(
+            cache.embed("what is mcp", "history A"), "what is mcp", "In context A", []
+        )
+
+        assert cache.lookup(cache.embed("explain mcp")) == ("Fresh", [])
+        assert cache.lookup(cache.embed("explain mcp", "history A")) == (
+            "In context A",
+            [],
+        )
+        assert cache.lookup(cache.embed("explain mcp", "history B")) is None
+
+    def test_numbers_must_match(self, cache):
+        """Near-identical embeddings but a different lesson number -> no hit."""
+        cache.store(cache.embed("lesson 1 of mcp"), "lesson 1 of mcp", "L1", [])
+
+        assert cache.lookup(cache.embed("lesson 2 of mcp")) is None
+        assert cache.lookup(cache.embed("mcp lesson 1")) == ("L1", [])
+
+    def test_quoted_terms_must_match(self, cache):
+        cache.store(
+            cache.embed('what is "tool use"'), 'what is "tool use"', "Tool use", []
+        )
+
+        assert cache.lookup(cache.embed('what is "tool calling"')) is None
+
+    def test_fifo_eviction(self, cache):
+        """Beyond max_entries the oldest entry is overwritten."""
+        cache.store(cache.embed("what is mcp"), "what is mcp", "first", [])
+        cache.store(
+            cache.embed("outline of rag course"), "outline of rag course", "second", []
+        )
+        cache.store(cache.embed("history A"), "history A", "third", [])
+
+        assert cache.lookup(cache.embed("what is mcp")) is None
+        assert cache.lookup(cache.embed("outline of rag course")) == ("second", [])
+        assert cache.lookup(cache.embed("history A")) == ("third", [])
+
+    def test_clear(self, cache):
+        cache.store(cache.embed("what is mcp"), "what is mcp", "answer", [])
+        cache.clear()
+
+        assert cache.lookup(cache.embed("what is mcp")) is None
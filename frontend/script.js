@@ -83,7 +83,7 @@ async function sendMessage() {
     chatMessages.scrollTop = chatMessages.scrollHeight;
 
     try {
-        const response = await fetch(`${API_URL}/query`, {
+        const response = await fetch(`${API_URL}/query/stream`, {
             method: 'POST',
             headers: {
                 'Content-Type': 'application/json',
@@ -96,16 +96,49 @@ async function sendMessage() {
 
         if (!response.ok) throw new Error('Query failed');
 
-        const data = await response.json();
-        
-        // Update session ID if new
-        if (!currentSessionId) {
-            currentSessionId = data.session_id;
-        }
+        // Read server-sent events and render the answer as it streams in
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let buffer = '';
+        let answer = '';
+        let messageDiv = null;
 
-        // Replace loading message with response
-        loadingMessage.remove();
-        addMessage(data.answer, 'assistant', data.sources);
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+
+            buffer += decoder.decode(value, { stream: true });
+            const events = buffer.split('\n\n');
+            buffer = events.pop();
+
+            for (const raw of events) {
+                if (!raw.startsWith('data: ')) continue;
+                const event = JSON.parse(raw.slice(6));
+
+                if (event.type === 'error') throw new Error(event.detail);
+
+                // Swap the loading indicator for the message on first output
+                if (!messageDiv) {
+                    loadingMessage.remove();
+                    messageDiv = createMessageElement('assistant');
+                }
+
+                if (event.type === 'delta') {
+                    answer += event.text;
+                    renderMessage(messageDiv, answer, 'assistant');
+                } else if (event.type === 'reset') {
+                    // Text so far was preamble to a tool call; start over
+                    answer = '';
+                    renderMessage(messageDiv, answer, 'assistant');
+                } else if (event.type === 'done') {
+                    // Update session ID if new
+                    if (!currentSessionId) {
+                        currentSessionId = event.session_id;
+                    }
+                    renderMessage(messageDiv, answer, 'assistant', event.sources);
+                }
+            }
+        }
 
     } catch (error) {
         // Replace loading message with error
@@ -133,12 +166,15 @@ function createLoadingMessage() {
     return messageDiv;
 }
 
-function addMessage(content, type, sources = null, isWelcome = false) {
-    const messageId = Date.now();
+function createMessageElement(type, isWelcome = false) {
     const messageDiv = document.createElement('div');
     messageDiv.className = `message ${type}${isWelcome ? ' welcome-message' : ''}`;
-    messageDiv.id = `message-${messageId}`;
-    
+    messageDiv.id = `message-${Date.now()}`;
+    chatMessages.appendChild(messageDiv);
+    return messageDiv;
+}
+
+function renderMessage(messageDiv, content, type, sources = null) {
     // Convert markdown to HTML for assistant messages
     const displayContent = type === 'assistant' ? marked.parse(content) : escapeHtml(content);
     
@@ -160,10 +196,13 @@ function addMessage(content, type, sources = null, isWelcome = false) {
     }
     
     messageDiv.innerHTML = html;
-    chatMessages.appendChild(messageDiv);
     chatMessages.scrollTop = chatMessages.scrollHeight;
-    
-    return messageId;
+}
+
+function addMessage(content, type, sources = null, isWelcome = false) {
+    const messageDiv = createMessageElement(type, isWelcome);
+    renderMessage(messageDiv, content, type, sources);
+    return messageDiv.id;
 }
 
 // Helper function to escape HTML for user messages